@@ -0,0 +1,891 @@
+import json
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import traceback
+from hashlib import sha256
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import streamlit as st
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 🔗 Your n8n PRODUCTION webhook URL (not the test URL)
+# Override with the N8N_WEBHOOK_URL environment variable.
+N8N_WEBHOOK_URL = os.environ.get(
+    "N8N_WEBHOOK_URL",
+    "https://sudhakar123.app.n8n.cloud/webhook/f4892281-e1a0-429c-ae0a-16661a18e576",
+)
+
+# Minimum seconds between live-preview updates while code streams in
+STREAM_PREVIEW_INTERVAL = 0.1
+
+# Per-entry-point settings; pass overrides to main()
+DEFAULT_CONFIG = {
+    "page_title": "AI Web App/Game Generator",
+    "title": "🧠 AI-Powered Web App/Game Generator",
+    "button_label": "Generate & Run",
+    "button_icon": "🎮",
+    "default_mode": "game",
+}
+
+# 💾 Generated code is cached per (prompt, mode) and persisted to disk,
+# so repeated clicks and server restarts don't re-run the LLM.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+LLM_CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.pkl")
+# Older versions persisted the cache as JSON; read once if no pickle yet
+LEGACY_LLM_CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.json")
+LLM_CACHE_TTL = 3600  # seconds
+LLM_CACHE_MAX_ENTRIES = 256
+
+# 🧭 Reworded prompts ("todo app", "a to-do list app") reuse cached code
+# through an embedding index. Optional: needs sentence-transformers.
+SEMANTIC_CACHE_PATH = os.path.join(DATA_DIR, "semantic_cache.npz")
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.93
+SEMANTIC_CACHE_MAX_ENTRIES = 1024
+
+# 🧪 New generated code is first loaded and rendered once in a throwaway
+# subprocess with CPU and memory limits, so a hang or runaway allocation
+# in its module code or first render_app() call can't stall the server
+# for every user. Later renders (after widget interaction) still run
+# in-process, and module-level side effects run once more in the child.
+SANDBOX_TIMEOUT = 30  # seconds
+SANDBOX_MEMORY_LIMIT = 2 * 1024 ** 3  # bytes
+
+_llm_cache_lock = threading.Lock()
+_semantic_cache_lock = threading.Lock()
+
+# In-flight n8n calls by cache key. Streamlit runs every session as a
+# thread of one process, so a plain dict + lock dedups across sessions.
+_inflight: dict = {}
+_inflight_lock = threading.Lock()
+
+
+@st.cache_resource
+def _http_client() -> requests.Session:
+    """
+    Shared HTTP session for talking to n8n.
+    Keeps connections alive across reruns and sessions, so warm calls
+    skip the TCP + TLS handshake.
+
+    Only failures where n8n never started the workflow are retried:
+    connection errors and 502/503. Read timeouts and 504s are not, as the
+    LLM generation may still be running and a retry would pay for it twice.
+    """
+    retries = Retry(
+        total=2,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503],
+        allowed_methods=frozenset({"POST"}),
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _cache_key(prompt: str, mode: str, variant: int = 0) -> str:
+    """
+    Deterministic cache key for a (prompt, mode) pair.
+    Whitespace and case differences in the prompt map to the same key.
+    variant: index of an extra variant of the same prompt (0 = the main one).
+    """
+    normalized = " ".join(prompt.split()).lower()
+    fields = {"prompt": normalized, "mode": mode}
+    if variant:
+        fields["variant"] = variant
+    raw = json.dumps(fields, sort_keys=True)
+    return sha256(raw.encode()).hexdigest()
+
+
+@st.cache_resource
+def _load_llm_cache() -> dict:
+    """
+    Load the persisted LLM cache once per server process.
+    The returned dict is shared by every session.
+    """
+    try:
+        with open(LLM_CACHE_PATH, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        # Truncated, corrupt or incompatible file: start with an empty cache
+        return {}
+
+    try:
+        with open(LEGACY_LLM_CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_llm_cache(key: str, code: str, etag: str = ""):
+    """
+    Add (or refresh) a cache entry, evict the oldest ones past the size
+    limit and write the cache back to disk.
+    etag: n8n's ETag for the code, used to revalidate the entry once expired.
+    """
+    cache = _load_llm_cache()
+    with _llm_cache_lock:
+        cache.pop(key, None)
+        cache[key] = {"code": code, "ts": time.time(), "etag": etag}
+        while len(cache) > LLM_CACHE_MAX_ENTRIES:
+            cache.pop(next(iter(cache)))
+        _write_llm_cache(cache)
+
+
+def _evict_generated_code(code: str):
+    """
+    Drop every LLM cache entry (and its semantic index row) holding code,
+    so the next request for those prompts really goes to n8n.
+    """
+    cache = _load_llm_cache()
+    with _llm_cache_lock:
+        keys = [key for key, entry in cache.items() if entry["code"] == code]
+        for key in keys:
+            del cache[key]
+        if keys:
+            _write_llm_cache(cache)
+    if keys:
+        _semantic_forget(keys)
+
+
+def _write_llm_cache(cache: dict):
+    """Write the LLM cache to disk. Call with _llm_cache_lock held."""
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp_path = LLM_CACHE_PATH + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cache, f, protocol=5)
+        os.replace(tmp_path, LLM_CACHE_PATH)
+    except OSError:
+        # Persisting is best effort; the in-memory cache still works.
+        pass
+
+
+@st.cache_resource
+def _embedding_model():
+    """
+    Sentence embedding model for the semantic cache, loaded once.
+    Returns None (semantic cache disabled) when sentence-transformers
+    isn't installed or the model can't be loaded, e.g. while offline.
+    The None is cached too, so a failed load isn't retried on every call.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(SEMANTIC_CACHE_MODEL)
+    except Exception:
+        return None
+
+
+@st.cache_data(max_entries=64)
+def _embed_prompt(prompt: str) -> np.ndarray:
+    """Unit-length float32 embedding of a prompt."""
+    model = _embedding_model()
+    return model.encode(prompt, normalize_embeddings=True).astype(np.float32)
+
+
+@st.cache_resource
+def _load_semantic_cache() -> dict:
+    """
+    Load the semantic index once per server process.
+
+    embs:  float32[N, dim] unit vectors of cached prompts
+    keys:  matching LLM cache keys (the code itself lives in the LLM cache)
+    modes: matching modes
+    """
+    try:
+        with np.load(SEMANTIC_CACHE_PATH) as data:
+            return {
+                "embs": data["embs"],
+                "keys": [str(k) for k in data["keys"]],
+                "modes": [str(m) for m in data["modes"]],
+            }
+    except (OSError, KeyError, ValueError):
+        return {"embs": None, "keys": [], "modes": []}
+
+
+def _semantic_lookup(prompt: str, mode: str) -> str:
+    """
+    Return the LLM cache key of the most similar cached prompt with the
+    same mode, or "" when nothing is close enough.
+    """
+    index = _load_semantic_cache()
+    if index["embs"] is None or _embedding_model() is None:
+        return ""
+
+    with _semantic_cache_lock:
+        embs, keys, modes = index["embs"], index["keys"], index["modes"]
+    try:
+        query = _embed_prompt(" ".join(prompt.split()).lower())
+        sims = embs @ query
+    except Exception:
+        # The semantic cache is an optimisation; never fail generation on it
+        return ""
+    sims[np.asarray(modes) != mode] = -1.0
+    best = int(np.argmax(sims))
+    return keys[best] if sims[best] >= SEMANTIC_CACHE_THRESHOLD else ""
+
+
+def _semantic_remember(prompt: str, mode: str, key: str):
+    """
+    Add a freshly generated prompt to the semantic index, keeping the
+    most recent SEMANTIC_CACHE_MAX_ENTRIES, and write it to disk.
+    """
+    if _embedding_model() is None:
+        return
+
+    try:
+        emb = _embed_prompt(" ".join(prompt.split()).lower())
+    except Exception:
+        return
+    index = _load_semantic_cache()
+    with _semantic_cache_lock:
+        keep = [i for i, k in enumerate(index["keys"]) if k != key]
+        keep = keep[-(SEMANTIC_CACHE_MAX_ENTRIES - 1):]
+        if index["embs"] is None:
+            index["embs"] = emb[None, :]
+        else:
+            index["embs"] = np.vstack([index["embs"][keep], emb[None, :]])
+        index["keys"] = [index["keys"][i] for i in keep] + [key]
+        index["modes"] = [index["modes"][i] for i in keep] + [mode]
+        _write_semantic_cache(index)
+
+
+def _semantic_forget(keys: list):
+    """Remove the rows for the given LLM cache keys from the semantic index."""
+    index = _load_semantic_cache()
+    with _semantic_cache_lock:
+        keep = [i for i, k in enumerate(index["keys"]) if k not in keys]
+        if index["embs"] is None or len(keep) == len(index["keys"]):
+            return
+        # An empty index is represented by embs=None, as on first load
+        index["embs"] = index["embs"][keep] if keep else None
+        index["keys"] = [index["keys"][i] for i in keep]
+        index["modes"] = [index["modes"][i] for i in keep]
+        _write_semantic_cache(index)
+
+
+def _write_semantic_cache(index: dict):
+    """Write the semantic index to disk. Call with _semantic_cache_lock held."""
+    try:
+        if index["embs"] is None:
+            if os.path.exists(SEMANTIC_CACHE_PATH):
+                os.remove(SEMANTIC_CACHE_PATH)
+            return
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp_path = SEMANTIC_CACHE_PATH + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            embs=index["embs"],
+            keys=np.asarray(index["keys"]),
+            modes=np.asarray(index["modes"]),
+        )
+        os.replace(tmp_path, SEMANTIC_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def _cached_code(key: str) -> str:
+    """Return unexpired cached code for an LLM cache key, or ""."""
+    entry = _load_llm_cache().get(key)
+    if entry and time.time() - entry["ts"] < LLM_CACHE_TTL:
+        return entry["code"]
+    return ""
+
+
+def _bump_cache_stat(name: str):
+    stats = st.session_state.setdefault("cache_stats", {"hits": 0, "misses": 0})
+    stats[name] += 1
+
+
+def call_n8n_generate_code(prompt: str, mode: str) -> str:
+    """
+    Return generated Python code for the user's prompt + mode.
+
+    Served from the LLM cache when the same (or, with the semantic cache,
+    a very similar) prompt/mode was generated recently, otherwise fetched
+    from n8n and cached.
+
+    mode: "app" or "game"
+    Returns the code as a string, or "" on failure.
+    """
+    key = _cache_key(prompt, mode)
+    code = _cached_code(key)
+    if not code:
+        similar_key = _semantic_lookup(prompt, mode)
+        code = _cached_code(similar_key) if similar_key else ""
+    if code:
+        _bump_cache_stat("hits")
+        return code
+
+    # Coalesce concurrent identical requests (e.g. two tabs clicking at
+    # once): the first caller hits n8n, the others wait for its result.
+    while True:
+        with _inflight_lock:
+            event = _inflight.get(key)
+            if event is None:
+                event = _inflight[key] = threading.Event()
+                break
+
+        # Wait for however long the leader's generation takes; it always
+        # sets the event when done, even on failure.
+        event.wait()
+        code = _cached_code(key)
+        if code:
+            _bump_cache_stat("hits")
+            return code
+        # The leader failed; loop so one waiter retries and the rest wait
+
+    try:
+        # A leader may have finished between our cache miss and taking
+        # the lock, so check again before calling n8n.
+        code = _cached_code(key)
+        if code:
+            _bump_cache_stat("hits")
+            return code
+
+        _bump_cache_stat("misses")
+        return _generate_and_cache(prompt, mode, key)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        event.set()
+
+
+def _generate_and_cache(prompt: str, mode: str, key: str) -> str:
+    """
+    Fetch code for prompt + mode from n8n, validate it and store it under key.
+    Returns the code, or "" on failure.
+    """
+    # An expired entry is revalidated with its ETag; if n8n answers
+    # 304 Not Modified, the stored code is still current.
+    stale = _load_llm_cache().get(key) or {}
+    code, etag = _fetch_generated_code(prompt, mode, etag=stale.get("etag", ""))
+    if code is None:
+        _store_llm_cache(key, stale["code"], etag)
+        return stale["code"]
+
+    if code and not _validate_generated_code(code):
+        return ""
+    if code:
+        _store_llm_cache(key, code, etag)
+        _semantic_remember(prompt, mode, key)
+    return code
+
+
+def call_n8n_generate_codes(prompts: list, mode: str) -> list:
+    """
+    Return generated code for several prompts using a single n8n call.
+
+    Prompts found in the LLM cache are served from it; the rest are sent
+    together. Repeating a prompt in the list asks for another variant of
+    it, cached separately from the first.
+    Returns one code string per prompt ("" on failure).
+    """
+    keys = []
+    variants = []
+    occurrences = {}
+    for prompt in prompts:
+        base_key = _cache_key(prompt, mode)
+        variant = occurrences.get(base_key, 0)
+        occurrences[base_key] = variant + 1
+        variants.append(variant)
+        keys.append(_cache_key(prompt, mode, variant))
+
+    codes = [_cached_code(key) for key in keys]
+    missing = [i for i, code in enumerate(codes) if not code]
+    for code in codes:
+        _bump_cache_stat("hits" if code else "misses")
+
+    if missing:
+        fetched = _fetch_generated_codes(
+            [prompts[i] for i in missing], [variants[i] for i in missing], mode
+        )
+        for i, code in zip(missing, fetched):
+            if code and _validate_generated_code(code):
+                _store_llm_cache(keys[i], code)
+                codes[i] = code
+    return codes
+
+
+def _validate_generated_code(code: str) -> bool:
+    """
+    Compile freshly generated code once, so broken output is reported
+    right away and never cached or stored in the session.
+    The compiled code object is reused when the code runs.
+    """
+    try:
+        _compile_generated(sha256(code.encode()).hexdigest(), code)
+    except (SyntaxError, ValueError, OverflowError, RecursionError, MemoryError) as e:
+        st.error(f"Generated code is not valid Python: {type(e).__name__}: {e}")
+        return False
+    return True
+
+
+def _fetch_generated_code(prompt: str, mode: str, etag: str = "") -> tuple:
+    """
+    Send the user's prompt + mode to n8n and get back generated Python code.
+
+    etag: ETag of code we already have; sent as If-None-Match.
+    Returns (code, etag). code is "" on failure and None when n8n
+    answered 304 Not Modified.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    try:
+        payload = {
+            "prompt": prompt,
+            "mode": mode,
+            # Ask the n8n AI Agent to mark its fixed system prompt as a
+            # provider prompt-cache breakpoint (cache_control: ephemeral)
+            "use_prefix_cache": True,
+        }
+        # (connect, read) timeouts: fail fast if n8n is unreachable,
+        # but give the LLM time to answer. When streaming, the read
+        # timeout applies between chunks, not to the whole generation.
+        with _http_client().post(
+            N8N_WEBHOOK_URL, json=payload, headers=headers, stream=True, timeout=(5, 90)
+        ) as resp:
+            if resp.status_code == 304:
+                return None, resp.headers.get("ETag", etag)
+            resp.raise_for_status()
+            code = _read_generated_code(resp).strip()
+            if not code:
+                _show_no_code_error()
+            return code, resp.headers.get("ETag", "")
+    except Exception as e:
+        st.error(f"Error contacting n8n: {e}")
+        st.code(traceback.format_exc())
+        return "", ""
+
+
+def _fetch_generated_codes(prompts: list, variants: list, mode: str) -> list:
+    """
+    Send several prompts to n8n in one request ({"prompts": [...]}).
+
+    variants: per-prompt variant index, matching the cache keys. The
+    workflow should use it as a seed / "make this one different" hint,
+    so repeated prompts don't come back identical.
+    n8n answers {"codes": [...]} in the same order.
+    Returns one code string per prompt ("" on failure).
+    """
+    try:
+        payload = {
+            "prompts": prompts,
+            "variants": variants,
+            "mode": mode,
+            "use_prefix_cache": True,
+        }
+        resp = _http_client().post(N8N_WEBHOOK_URL, json=payload, timeout=(5, 90))
+        resp.raise_for_status()
+        codes = [(code or "").strip() for code in resp.json().get("codes") or []]
+    except Exception as e:
+        st.error(f"Error contacting n8n: {e}")
+        st.code(traceback.format_exc())
+        return [""] * len(prompts)
+    codes = (codes + [""] * len(prompts))[: len(prompts)]
+    if not all(codes):
+        _show_no_code_error()
+    return codes
+
+
+def _show_no_code_error():
+    st.error(
+        "No code received from n8n. "
+        "Check your n8n workflow, AI Agent output, or logs."
+    )
+
+
+def _read_generated_code(resp: requests.Response) -> str:
+    """
+    Read the generated code from an n8n response, with a live preview
+    while it streams in.
+
+    text/plain (preferred): the body is the code itself.
+    application/x-ndjson: one {"code": "<next chunk>"} object per line.
+    application/json: a single object with a "code" field.
+    """
+    content_type = resp.headers.get("Content-Type", "")
+    if content_type.startswith("application/json"):
+        return resp.json().get("code") or ""
+
+    if content_type.startswith("application/x-ndjson"):
+        chunks = (
+            json.loads(line).get("code") or ""
+            for line in resp.iter_lines(decode_unicode=True)
+            if line
+        )
+    else:
+        # requests assumes ISO-8859-1 for text/* without a charset
+        if "charset" not in content_type:
+            resp.encoding = "utf-8"
+        chunks = resp.iter_content(chunk_size=None, decode_unicode=True)
+
+    # Each preview update resends the whole program, so refresh it at most
+    # every STREAM_PREVIEW_INTERVAL seconds rather than once per chunk.
+    preview = st.empty()
+    parts = []
+    last_preview = 0.0
+    for chunk in chunks:
+        parts.append(chunk)
+        now = time.monotonic()
+        if now - last_preview >= STREAM_PREVIEW_INTERVAL:
+            preview.code("".join(parts), language="python")
+            last_preview = now
+    preview.empty()
+    return "".join(parts)
+
+
+@st.cache_resource(max_entries=128)
+def _compile_generated(code_hash: str, _code: str):
+    """
+    Compile generated code once per server process.
+    Code objects are immutable, so every session running the same code
+    shares one. Only code_hash is hashed for the cache key (Streamlit
+    skips parameters starting with an underscore).
+    """
+    return compile(_code, f"<gen:{code_hash[:8]}>", "exec")
+
+
+class _SandboxError(Exception):
+    """Generated code failed or misbehaved in the sandbox subprocess."""
+
+
+def _limit_resource(which: int, limit: int):
+    """Lower a soft resource limit, never above the inherited hard limit."""
+    _, hard = resource.getrlimit(which)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(which, (limit, hard))
+
+
+def _sandbox_child(code: str, code_hash: str, conn):
+    """
+    Subprocess side of _sandbox_check(): exec the code and call
+    render_app() once under resource limits, then send back "" on
+    success or the trimmed traceback text.
+    Without a ScriptRunContext, st calls in the child are no-ops.
+    """
+    try:
+        if resource is not None:
+            _limit_resource(resource.RLIMIT_CPU, SANDBOX_TIMEOUT)
+            _limit_resource(resource.RLIMIT_AS, SANDBOX_MEMORY_LIMIT)
+
+        local_ns = {"st": st}
+        exec(compile(code, f"<gen:{code_hash[:8]}>", "exec"), local_ns, local_ns)
+        render_func = local_ns.get("render_app")
+        if callable(render_func):
+            render_func()
+        conn.send("")
+    except BaseException as e:
+        conn.send(_format_generated_traceback(e))
+    finally:
+        conn.close()
+
+
+@st.cache_resource(max_entries=128)
+def _sandbox_check(code_hash: str, _code: str):
+    """
+    Load and render generated code once in a subprocess before it is
+    exec'd in the server. Returns True if it ran cleanly, otherwise
+    raises _SandboxError describing the failure.
+    Only a clean run is cached (Streamlit doesn't cache exceptions), so
+    each good program is checked once per process while failures, which
+    may be transient (timeouts under load, flaky network calls), are
+    checked again next time.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    # forkserver/spawn start clean, without copying the server's state
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_sandbox_child, args=(_code, code_hash, child_conn), daemon=True)
+    proc.start()
+    child_conn.close()
+
+    try:
+        if not parent_conn.poll(SANDBOX_TIMEOUT):
+            error = f"Generated code did not finish running within {SANDBOX_TIMEOUT}s."
+        else:
+            error = parent_conn.recv()
+    except EOFError:
+        # The child died without reporting, e.g. killed by a resource limit
+        proc.join()
+        error = f"Generated code crashed while running (exit code {proc.exitcode})."
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
+        parent_conn.close()
+
+    if error:
+        raise _SandboxError(error)
+    return True
+
+
+def _load_render_func(code: str, code_hash: str):
+    """
+    Exec the generated code (at most once per session) and return its
+    render_app() function, or None after showing an error.
+    Exceptions raised by the generated code propagate to the caller.
+    """
+    # Reruns reuse the namespace of the last successful exec, so the
+    # module-level code only runs once per generated program.
+    ns_key = "_ns_" + code_hash
+    local_ns = st.session_state.get(ns_key)
+    if local_ns is None:
+        # Step 0: make sure the code loads safely outside the server process
+        try:
+            with st.spinner("Checking generated code..."):
+                _sandbox_check(code_hash, code)
+        except _SandboxError as e:
+            # Don't keep serving rejected code from the cache; the next
+            # Generate click for this prompt should ask n8n again.
+            _evict_generated_code(code)
+            st.error("Generated code failed in the sandbox, so it was not run.")
+            st.text(str(e))
+            return None
+
+        # Step 1: compile (shared across sessions) and exec the code
+        code_obj = _compile_generated(code_hash, code)
+
+        # Inject Streamlit into the execution namespace
+        local_ns = {"st": st}
+        exec(code_obj, local_ns, local_ns)
+        # Keep only the current program's namespace; older ones can hold
+        # large objects (dataframes, models) that are no longer rendered.
+        for key in [k for k in st.session_state if str(k).startswith("_ns_")]:
+            del st.session_state[key]
+        st.session_state[ns_key] = local_ns
+
+    # Step 2: find render_app()
+    render_func = local_ns.get("render_app")
+    if not callable(render_func):
+        st.error(
+            "render_app() function not found in generated code.\n"
+            "Ensure your n8n AI Agent always defines:\n"
+            "    def render_app():\n"
+        )
+        return None
+    return render_func
+
+
+def run_generated_code(code: str):
+    """
+    Execute the given Python code and run render_app() if present.
+    Shows detailed errors if anything goes wrong.
+    """
+    if not code.strip():
+        st.error("No code to run.")
+        return
+
+    code_hash = sha256(code.encode()).hexdigest()
+
+    try:
+        # Fast path: same code as the last render, just call render_app() again
+        render_func = st.session_state.get("_render_func")
+        if st.session_state.get("_last_rendered_hash") != code_hash or not callable(render_func):
+            render_func = _load_render_func(code, code_hash)
+            if render_func is None:
+                return
+            st.session_state["_last_rendered_hash"] = code_hash
+            st.session_state["_render_func"] = render_func
+
+        render_func()
+    except Exception as e:
+        st.error("Error while running generated code.")
+        # Plain text: no syntax highlighting needed for a traceback
+        st.text(_format_generated_traceback(e))
+
+
+def _format_generated_traceback(exc: BaseException) -> str:
+    """
+    Format exc starting at the first frame of the generated code,
+    dropping the Streamlit and app_core frames that lead up to it.
+    """
+    tb = traceback.TracebackException.from_exception(exc)
+    frames = list(tb.stack)
+    for i, frame in enumerate(frames):
+        if frame.filename.startswith("<gen"):
+            tb.stack = traceback.StackSummary.from_list(frames[i:])
+            break
+    return "".join(tb.format())
+
+
+# Number of variants requested by the "Generate variants" button
+VARIANT_COUNT = 3
+
+# Static page text, built once at import instead of on every rerun
+_SIDEBAR_STEPS_MD = (
+    "1. Enter an idea for an app or game\n"
+    "2. Choose **App** or **Game**\n"
+    "3. Click **{button_label}**\n"
+    "4. Use or play the generated app directly on this page\n"
+)
+_SIDEBAR_STACK_MD = "**Backend:** n8n + LLM\n**Frontend:** Streamlit"
+_PROMPT_PLACEHOLDER = (
+    "Examples:\n"
+    "- A simple calculator with history\n"
+    "- A to-do list app with add/delete/complete\n"
+    "- A number guessing game\n"
+    "- A snake game with arrow buttons\n"
+)
+
+
+@st.fragment
+def _prompt_panel(config: dict):
+    """
+    Prompt, mode selector and generate button.
+    As a fragment, typing or switching mode reruns only this panel,
+    not the generated app below.
+    """
+    # User prompt
+    prompt = st.text_area(
+        "Describe the app or game you want to generate:",
+        height=150,
+        placeholder=_PROMPT_PLACEHOLDER,
+    )
+
+    # Mode selector
+    mode_label = st.radio(
+        "Select what you want to generate:",
+        options=["App", "Game"],
+        index=0 if config["default_mode"] == "app" else 1,
+        horizontal=True,
+    )
+    mode_value = "app" if mode_label == "App" else "game"
+
+    # Main button: Generate & Run, plus a batched "variants" button
+    run_col, variants_col = st.columns(2)
+    run_clicked = run_col.button(
+        f"{config['button_icon']} {config['button_label']}", type="primary"
+    )
+    variants_clicked = variants_col.button(f"🎲 Generate {VARIANT_COUNT} variants")
+
+    if (run_clicked or variants_clicked) and not prompt.strip():
+        st.warning("Please enter a description for your app or game first.")
+    elif run_clicked:
+        with st.spinner("Generating code via n8n + LLM and running app..."):
+            code = call_n8n_generate_code(prompt.strip(), mode_value)
+        # On failure the n8n call has already shown what went wrong
+        if code:
+            _select_generated_code(code)
+    elif variants_clicked:
+        with st.spinner(f"Generating {VARIANT_COUNT} variants via n8n + LLM..."):
+            codes = call_n8n_generate_codes([prompt.strip()] * VARIANT_COUNT, mode_value)
+        # Keep each variant's number, so labels stay stable if one failed
+        variants = [(i, code) for i, code in enumerate(codes, start=1) if code]
+        if variants:
+            st.session_state["generated_variants"] = variants
+            # The errors shown above are cleared by the rerun, so remember
+            # which variants failed and let _show_variants report them.
+            st.session_state["_failed_variants"] = [
+                i for i, code in enumerate(codes, start=1) if not code
+            ]
+            # Full rerun so the variants fragment picks them up
+            st.rerun()
+
+
+@st.fragment
+def _show_variants():
+    """
+    Side-by-side previews of generated variants, each with a Run button.
+    As a fragment, the code previews aren't resent to the browser when
+    only the prompt panel reruns.
+    """
+    variants = st.session_state.get("generated_variants") or []
+    if not variants:
+        return
+
+    failed = st.session_state.pop("_failed_variants", [])
+    if failed:
+        numbers = ", ".join(str(i) for i in failed)
+        st.warning(
+            f"Variant {numbers} could not be generated: n8n returned no code "
+            "or invalid Python. Try generating variants again."
+        )
+
+    for col, (i, code) in zip(st.columns(len(variants)), variants):
+        with col:
+            st.markdown(f"**Variant {i}**")
+            st.code(code, language="python")
+            if st.button(f"▶️ Run variant {i}", key=f"_run_variant_{i}"):
+                _select_generated_code(code)
+
+
+def _select_generated_code(code: str):
+    """Make code the app shown below and rerun the whole page."""
+    st.session_state["generated_code"] = code
+    st.session_state["_just_generated"] = True
+    # Full rerun so the generated app (and sidebar stats) refresh
+    st.rerun()
+
+
+def _render_generated():
+    """
+    Render the generated app, if any.
+    Deliberately not a fragment: generated apps often use st.sidebar,
+    which Streamlit doesn't allow inside fragments.
+    """
+    code = st.session_state.get("generated_code", "")
+    if not code:
+        return
+    if st.session_state.pop("_just_generated", False):
+        st.info("Running generated app below 👇")
+    run_generated_code(code)
+
+
+def main(config: Optional[dict] = None):
+    """
+    Render the generator page.
+    config: overrides for DEFAULT_CONFIG (title, button label, default mode).
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    button_label = config["button_label"]
+
+    st.set_page_config(
+        page_title=config["page_title"],
+        layout="wide",
+    )
+
+    st.title(config["title"])
+    st.write(
+        f"Describe the app or game you want. When you click **{button_label}**, "
+        "your idea is sent to an n8n workflow, an LLM generates Streamlit code, "
+        "and the app/game opens directly below on this page."
+    )
+
+    # Sidebar instructions
+    with st.sidebar:
+        st.header("How it works")
+        st.markdown(_SIDEBAR_STEPS_MD.format(button_label=button_label))
+        st.markdown("---")
+        st.markdown(_SIDEBAR_STACK_MD)
+
+    # Keep latest code in session (so app can persist across reruns)
+    if "generated_code" not in st.session_state:
+        st.session_state["generated_code"] = ""
+
+    _prompt_panel(config)
+    _show_variants()
+    _render_generated()
+
+    # Cache stats go last so they include this run's lookup
+    stats = st.session_state.get("cache_stats", {"hits": 0, "misses": 0})
+    with st.sidebar:
+        st.markdown("---")
+        st.caption(f"LLM cache: {stats['hits']} hits / {stats['misses']} misses")
+